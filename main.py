@@ -2,6 +2,7 @@
 
 from pathlib import Path
 
+from .subagents.asset_index_agent import AssetIndexAgent
 from .subagents.brief_ingestion_agent import BriefIngestionAgent
 from .subagents.copy_agent import CopywritingAgent
 from .subagents.image_agent import ImageGenerationAgent
@@ -16,6 +17,7 @@ class Orchestrator:
     Responsibilities:
       1. Load the brief
       2. Build campaign + product config
+         (+ refresh the DAM asset index)
       3. Create product output folders
       4. Generate copy.json per product
       5. Generate hero images + composite local assets
@@ -23,7 +25,7 @@ class Orchestrator:
 
     """
 
-    def __init__(self, project_root=None):
+    def __init__(self, project_root=None, memory_bounded=False, mem_report=False, large_sizes=False):
         # project_root should resolve to scaled_content_agent/
         if project_root is None:
             self.project_root = Path(__file__).resolve().parent
@@ -32,8 +34,14 @@ class Orchestrator:
 
         # Instantiate tool and llm subagents
         self.brief_agent = BriefIngestionAgent(project_root=self.project_root)
+        self.asset_index = AssetIndexAgent(project_root=self.project_root)
         self.copy_agent = CopywritingAgent()
-        self.image_agent = ImageGenerationAgent()
+        self.image_agent = ImageGenerationAgent(
+            asset_index=self.asset_index,
+            memory_bounded=memory_bounded,
+            mem_report=mem_report,
+            large_sizes=large_sizes,
+        )
 
     def run_ingestion_and_prepare_outputs(self, brief_path, output_root, seed=None):
         """
@@ -54,6 +62,9 @@ class Orchestrator:
         # 1. BRIEF AGENT: Ingest brief → CampaignConfig + ProductConfigs
         campaign_cfg = self.brief_agent.ingest(brief_path)
 
+        # 1b. ASSET INDEX: re-index only new/changed DAM assets (sidecar invalidated by mtime)
+        self.asset_index.build()
+
         # 2. Create per-product output folders
         for product in campaign_cfg.products:
             product_dir = output_root / product.slug
@@ -109,9 +120,8 @@ class Orchestrator:
             product_dir = output_root / p.slug
             print(f"    copy:         {product_dir / 'copy.json'}")
             print("    renders:")
-            print(f"      - {product_dir / '1x1_awareness.png'}")
-            print(f"      - {product_dir / '9x16_awareness.png'}")
-            print(f"      - {product_dir / '16x9_awareness.png'}")
+            for ratio_label in self.image_agent.aspect_ratios:
+                print(f"      - {product_dir / f'{ratio_label}_awareness.png'}")
         print(f"  Legal disclaimer: {cfg.legal_disclaimer}")
 
         print("\nStatus: ✅ All outputs generated successfully.\n")
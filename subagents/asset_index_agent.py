@@ -0,0 +1,257 @@
+# scaled_content_agent/subagents/asset_index_agent.py
+
+import os
+import json
+import hashlib
+from pathlib import Path
+
+# pillow reads the alpha channel so we can trim transparent padding once, not per render
+from PIL import Image
+
+
+# bump this if the entry layout changes, old sidecars get rebuilt automatically
+INDEX_VERSION = 1
+
+
+class AssetIndexAgent:
+    """
+    v1 Asset Index Tool (stubbed DAM index)
+    ---------------------------------------
+    - Walks inputs/assets and inputs/brand for PNG assets
+    - Records per asset:
+        • content hash (sha256)
+        • original dimensions
+        • alpha bounding box
+        • path to a pre-trimmed RGBA copy (transparent padding removed)
+    - Persists everything to a sidecar index:
+        inputs/.asset_index/index.json
+        inputs/.asset_index/trimmed/<sha256>.png
+    - Entries are invalidated by file mtime (+ size), so only changed assets get re-decoded
+    """
+
+    def __init__(self, project_root, asset_roots=("inputs/assets", "inputs/brand")):
+        # project_root will be scaled_content_agent/
+        self.project_root = Path(project_root)
+        self.asset_roots = [self.project_root / r for r in asset_roots]
+
+        self.index_dir = self.project_root / "inputs" / ".asset_index"
+        self.index_path = self.index_dir / "index.json"
+        self.trimmed_dir = self.index_dir / "trimmed"
+
+        # key = asset path relative to project_root (posix), value = entry dict
+        self.entries = {}
+        self._dirty = False
+
+    # call once per run (the orchestrator does this), lookups after that are dict hits + a stat
+    def build(self):
+        """
+        Loads the sidecar index, re-indexes new or modified assets,
+        drops entries for deleted assets, cleans up orphaned trimmed copies
+        and writes the index back if anything changed.
+        """
+        self.entries = self._read_index()
+        self._dirty = False
+
+        seen = set()
+        index_dir = self.index_dir.resolve()
+        for root in self.asset_roots:
+            if not root.exists():
+                print(f"⚠️ Asset root not found at {root}, skipping.")
+                continue
+            for dirpath, dirnames, filenames in os.walk(root):
+                # never index our own sidecar folder (only matters if a root is e.g. inputs/)
+                dirnames[:] = [d for d in dirnames if (Path(dirpath) / d).resolve() != index_dir]
+                for filename in filenames:
+                    if not filename.lower().endswith(".png"):
+                        continue
+                    path = Path(dirpath) / filename
+                    key = self._key(path)
+                    seen.add(key)
+                    self._refresh(key, path)
+
+        # assets removed from the DAM since the last run.
+        # keys outside the walked roots (assetFolder / logoPath pointing elsewhere) are never
+        # in seen, so those are only dropped once the file itself is gone
+        root_prefixes = tuple(self._key(root) + "/" for root in self.asset_roots)
+        for key in list(self.entries):
+            if key in seen:
+                continue
+            if key.startswith(root_prefixes) or not self._path_for_key(key).exists():
+                del self.entries[key]
+                self._dirty = True
+
+        if self._dirty:
+            self._write_index()
+
+        self._prune_trimmed()
+
+        print(f"🗂️ Asset index ready: {len(self.entries)} assets ({self.index_path})")
+        return self.entries
+
+    def lookup(self, path):
+        """
+        Returns the index entry for an asset path, or None if it doesn't exist.
+        Stale entries (mtime/size changed) are re-indexed on the spot.
+        """
+        path = Path(path)
+        key = self._key(path)
+        entry = self._refresh(key, path)
+        if self._dirty:
+            self._write_index()
+        return entry
+
+    def load_trimmed(self, path, label):
+        """
+        Loads the pre-trimmed RGBA copy of an asset straight from the index.
+        Falls back to decoding the source png if it couldn't be indexed/trimmed.
+        Returns None if the asset is missing, unreadable or fully transparent.
+        """
+        path = Path(path)
+        entry = self.lookup(path)
+        # lookup only returns None when the file couldn't be stat'd
+        if entry is None:
+            print(f"⚠️ {label} image not found at {path}, skipping.")
+            return None
+        if entry.get("error"):
+            print(f"⚠️ {label} image couldn't be indexed ({path}): {entry['error']}, loading source instead.")
+            return self._load_source(path, label)
+        if entry["trimmed_path"] is None:
+            print(f"⚠️ {label} image is fully transparent ({path}), skipping.")
+            return None
+
+        try:
+            with Image.open(self.index_dir / entry["trimmed_path"]) as img:
+                return img.convert("RGBA")
+        except Exception as e:
+            print(f"⚠️ Failed to load trimmed {label} image ({path}): {e}, loading source instead.")
+            return self._load_source(path, label)
+
+    # same graceful fallback the image agent used before the index existed
+    def _load_source(self, path, label):
+        try:
+            with Image.open(path) as img:
+                return img.convert("RGBA")
+        except Exception as e:
+            print(f"⚠️ Failed to load {label} image ({path}): {e}")
+            return None
+
+    # keys are relative so the sidecar survives moving the project folder
+    def _key(self, path):
+        path = Path(path).resolve()
+        try:
+            return path.relative_to(self.project_root.resolve()).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def _path_for_key(self, key):
+        path = Path(key)
+        return path if path.is_absolute() else self.project_root / path
+
+    # trimmed copies are shared by sha, so only delete files no entry points at anymore
+    def _prune_trimmed(self):
+        if not self.trimmed_dir.exists():
+            return
+        referenced = {e["trimmed_path"] for e in self.entries.values() if e["trimmed_path"]}
+        for trimmed_file in self.trimmed_dir.glob("*.png"):
+            if f"trimmed/{trimmed_file.name}" not in referenced:
+                try:
+                    trimmed_file.unlink()
+                except OSError as e:
+                    print(f"⚠️ Failed to remove orphaned trimmed asset ({trimmed_file}): {e}")
+
+    def _refresh(self, key, path):
+        try:
+            stat = path.stat()
+        except OSError:
+            if key in self.entries:
+                del self.entries[key]
+                self._dirty = True
+            return None
+
+        entry = self.entries.get(key)
+        if (
+            entry is not None
+            and not entry.get("error")
+            and entry["mtime_ns"] == stat.st_mtime_ns
+            and entry["size"] == stat.st_size
+            and (entry["trimmed_path"] is None or (self.index_dir / entry["trimmed_path"]).exists())
+        ):
+            return entry
+
+        try:
+            entry = self._index_file(path, stat)
+        except Exception as e:
+            # keep the asset (it exists!) so callers can fall back to the source png.
+            # error entries are never treated as fresh, so the next lookup/run retries
+            print(f"⚠️ Failed to index asset ({path}): {e}")
+            entry = {
+                "sha256": None,
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "width": None,
+                "height": None,
+                "alpha_bbox": None,
+                "trimmed_path": None,
+                "error": str(e),
+            }
+
+        self.entries[key] = entry
+        self._dirty = True
+        return entry
+
+    def _index_file(self, path, stat):
+        data = path.read_bytes()
+        sha = hashlib.sha256(data).hexdigest()
+
+        with Image.open(path) as src:
+            img = src.convert("RGBA")
+        width, height = img.size
+
+        # bbox of non-transparent pixels, None if the whole canvas is transparent
+        bbox = img.getchannel("A").getbbox()
+
+        trimmed_path = None
+        if bbox is not None:
+            # trimmed copies are keyed by content hash so duplicate assets share one file
+            trimmed_path = f"trimmed/{sha}.png"
+            trimmed_file = self.index_dir / trimmed_path
+            if not trimmed_file.exists():
+                self.trimmed_dir.mkdir(parents=True, exist_ok=True)
+                img.crop(bbox).save(trimmed_file)
+
+        return {
+            "sha256": sha,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "width": width,
+            "height": height,
+            "alpha_bbox": list(bbox) if bbox is not None else None,
+            "trimmed_path": trimmed_path,
+        }
+
+    def _read_index(self):
+        if not self.index_path.exists():
+            return {}
+        try:
+            with self.index_path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Failed to read asset index ({self.index_path}), rebuilding: {e}")
+            return {}
+        if data.get("version") != INDEX_VERSION:
+            return {}
+        return data.get("assets", {})
+
+    def _write_index(self):
+        # the sidecar is just a cache, a read-only DAM mount shouldn't stop a render
+        try:
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            # write to a temp file then swap so a crashed run never leaves half an index
+            tmp_path = self.index_path.with_suffix(".json.tmp")
+            with tmp_path.open("w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "assets": self.entries}, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            print(f"⚠️ Failed to write asset index ({self.index_path}), continuing without it: {e}")
+        # not retried on every lookup, the next change tries again
+        self._dirty = False
@@ -12,18 +12,54 @@ from google.genai.types import GenerateImagesConfig
 # use pillow to help us load existing assets and compose them
 from PIL import Image, ImageOps
 
+from ..utils.memory_stats import StageMemoryTracker
+
+# opt-in large formats (4K + A4 print @ 300dpi), these are the ones that blow up render pod memory
+LARGE_ASPECT_RATIOS = {
+    "16x9_4k": (3840, 2160),
+    "9x16_4k": (2160, 3840),
+    "a4_print": (2480, 3508),
+}
+
+# Imagen (aspect_ratio, image_size) per ratio. Anything not listed uses the v1 "1:1" / "1K" request.
+# 2K is the biggest Imagen 4 goes, so large sizes are still upscaled ~1.4x (A4 ends up ~220dpi of
+# real detail); the matching aspect + center crop at least avoids stretching a square to fit.
+IMAGEN_RATIO_CONFIG = {
+    "16x9_4k": ("16:9", "2K"),
+    "9x16_4k": ("9:16", "2K"),
+    "a4_print": ("3:4", "2K"),
+}
+
+# dpi written into the png for print ratios, otherwise print tools assume 72dpi (way bigger than A4)
+RATIO_DPI = {
+    "a4_print": (300, 300),
+}
+
+
 # Create image gen agent
 class ImageGenerationAgent:
     """
     v1 Image Agent:
       - Generates a hero background using Imagen
       - Loads local product.png, mascot.png, and brand logo
+        (pre-trimmed copies from the asset index when one is passed in)
       - Composites layers onto the background using Pillow
-      - Saves 3 aspect ratios per product
+      - Saves 3 aspect ratios per product (+ 4K / print sizes when large_sizes=True)
+      - memory_bounded=True keeps at most one full-size canvas alive:
+          • assets are shrunk once to the biggest box any ratio needs
+          • layers are composited in place on the background (no extra copy)
+          • canvases are closed right after the png is encoded
+      - mem_report=True prints peak memory (tracemalloc + RSS) per stage
     """
+    # layout boxes are (W // divisor, H // divisor) of the canvas.
+    # shared by _composite_layers and the memory-bounded pre-shrink so they can't drift apart
+    PRODUCT_BOX_DIVISOR = 2
+    MASCOT_BOX_DIVISOR = 5
+    LOGO_BOX_DIVISOR = 6
+
     # again pass env vars during construction
     # default is vertexai true which is needed
-    def __init__(self):
+    def __init__(self, asset_index=None, memory_bounded=False, mem_report=False, large_sizes=False):
         location = os.environ.get("GOOGLE_CLOUD_LOCATION", "us-central1")
         project_id = os.environ.get("GOOGLE_CLOUD_PROJECT", "adk-llm-agent")
         # create genai client
@@ -38,6 +74,14 @@ class ImageGenerationAgent:
             "9x16": (900, 1600),
             "16x9": (1600, 900),
         }
+        if large_sizes:
+            self.aspect_ratios.update(LARGE_ASPECT_RATIOS)
+
+        # optional AssetIndexAgent, falls back to reading pngs from disk when None
+        self.asset_index = asset_index
+
+        self.memory_bounded = memory_bounded
+        self.mem_tracker = StageMemoryTracker(enabled=mem_report)
 
     # this function ALWAYS generates outputs.
     # it loads assets if they exist for consistency.
@@ -45,6 +89,21 @@ class ImageGenerationAgent:
     # generate the hero
     def generate_images_for_products(self, campaign_cfg, output_root, seed=None):
         output_root = Path(output_root)
+        self.mem_tracker.start()
+        # always stop tracing, tracemalloc left on slows down the rest of the process
+        try:
+            self._render_products(campaign_cfg, output_root, seed)
+            self.mem_tracker.print_report()
+        finally:
+            self.mem_tracker.stop()
+
+    def _render_products(self, campaign_cfg, output_root, seed):
+        # brand logo is the same for every product so load it once per run
+        with self.mem_tracker.stage("load_assets"):
+            logo_img = self._load_png(campaign_cfg.brand_logo_path, "logo")
+            if self.memory_bounded:
+                logo_img = self._shrink_for_ratios(logo_img, self.LOGO_BOX_DIVISOR)
+
         # loop thru products in config (2)
         for product in campaign_cfg.products:
             # create the folders if they dont exist on the parent directory
@@ -63,50 +122,89 @@ class ImageGenerationAgent:
             product_image_path = product.asset_folder / "product.png"
             mascot_image_path = product.asset_folder / "mascot.png"
 
-            # brand logo
-            logo_path = campaign_cfg.brand_logo_path
-
             # Load assets (skip missing, warn lightly)
-            product_img = self._load_png(product_image_path, "product")
-            mascot_img = self._load_png(mascot_image_path, "mascot")  # optional
-            logo_img = self._load_png(logo_path, "logo")
+            with self.mem_tracker.stage("load_assets"):
+                product_img = self._load_png(product_image_path, "product")
+                mascot_img = self._load_png(mascot_image_path, "mascot")  # optional
+                if self.memory_bounded:
+                    product_img = self._shrink_for_ratios(product_img, self.PRODUCT_BOX_DIVISOR)
+                    mascot_img = self._shrink_for_ratios(mascot_img, self.MASCOT_BOX_DIVISOR)
 
             # Generate all ratios
             for ratio_label, (w, h) in self.aspect_ratios.items():
                 print(f"\n▶ Generating background for {product.name} / {ratio_label}")
                 # create hero image
-                background = self._generate_background_image(
-                    product=product,
-                    campaign_cfg=campaign_cfg,
-                    copy_data=copy_data,
-                    width=w,
-                    height=h,
-                    seed=seed,
-                )
+                with self.mem_tracker.stage("background"):
+                    background = self._generate_background_image(
+                        product=product,
+                        campaign_cfg=campaign_cfg,
+                        copy_data=copy_data,
+                        width=w,
+                        height=h,
+                        seed=seed,
+                        ratio_label=ratio_label,
+                    )
 
                 # Now composite all the things generated or loaded
-                final_img = self._composite_layers(
-                    background=background,
-                    product_img=product_img,
-                    mascot_img=mascot_img,
-                    logo_img=logo_img,
-                )
+                with self.mem_tracker.stage("composite"):
+                    final_img = self._composite_layers(
+                        background=background,
+                        product_img=product_img,
+                        mascot_img=mascot_img,
+                        logo_img=logo_img,
+                        in_place=self.memory_bounded,
+                    )
                 # append the file names to have the campaign names in them (some DSPs require specific names)
                 output_path = product_dir / f"{ratio_label}_awareness.png"
-                final_img.save(output_path)
+                with self.mem_tracker.stage("encode"):
+                    dpi = RATIO_DPI.get(ratio_label)
+                    if dpi:
+                        final_img.save(output_path, dpi=dpi)
+                    else:
+                        final_img.save(output_path)
+                    # free the pixel buffers now, not whenever gc gets around to it
+                    final_img.close()
+                    background.close()
+                    del final_img, background
                 print(f"✅ Saved {output_path}")
 
+            # drop this product's assets before loading the next one
+            for img in (product_img, mascot_img):
+                if img is not None:
+                    img.close()
+            del product_img, mascot_img
+
+        if logo_img is not None:
+            logo_img.close()
+
+    # memory-bounded mode: shrink an asset once to the largest box any ratio will ask for
+    # (W // divisor, H // divisor) so we never hold the full-res DAM original
+    def _shrink_for_ratios(self, img, divisor):
+        if img is None:
+            return None
+        max_w = max(w // divisor for w, _ in self.aspect_ratios.values())
+        max_h = max(h // divisor for _, h in self.aspect_ratios.values())
+        # thumbnail works in place, keeps aspect and never upscales
+        img.thumbnail((max_w, max_h), Image.LANCZOS)
+        return img
+
     # returns None if there is no png, thus omitting it by design
     # converts all to rgba so that transparency is considered.
     def _load_png(self, path, label):
         """
         Loads a PNG if it exists; otherwise returns None.
+        Uses the trimmed copy from the asset index when available.
         Keeps POC clean with graceful fallback.
         """
+        if self.asset_index is not None:
+            return self.asset_index.load_trimmed(path, label)
+
         try:
             path = Path(path)
             if path.exists():
-                return Image.open(path).convert("RGBA")
+                # with block closes the file handle, convert() already copied the pixels
+                with Image.open(path) as img:
+                    return img.convert("RGBA")
             else:
                 print(f"⚠️ {label} image not found at {path}, skipping.")
                 return None
@@ -114,7 +212,7 @@ class ImageGenerationAgent:
             print(f"⚠️ Failed to load {label} image ({path}): {e}")
             return None
 
-    def _generate_background_image(self, product, campaign_cfg, copy_data, width, height, seed):
+    def _generate_background_image(self, product, campaign_cfg, copy_data, width, height, seed, ratio_label=None):
         """
         Calls Imagen to generate a hero background that ALSO includes text:
           - headline
@@ -143,19 +241,23 @@ class ImageGenerationAgent:
                 f"where a mascot or character might sit: '{disclaimer}'. "
             )
 
+        # large sizes ask for their own aspect + 2K, everything else keeps the v1 square 1K request
+        imagen_config = IMAGEN_RATIO_CONFIG.get(ratio_label)
+        aspect_ratio, image_size = imagen_config or ("1:1", "1K")
+
         # Build config; only pass seed if not None
         if seed is not None:
             config = GenerateImagesConfig(
-                aspect_ratio="1:1",
-                image_size="1K",
+                aspect_ratio=aspect_ratio,
+                image_size=image_size,
                 number_of_images=1,
                 output_mime_type="image/png",
                 seed=seed,
             )
         else:
             config = GenerateImagesConfig(
-                aspect_ratio="1:1",
-                image_size="1K",
+                aspect_ratio=aspect_ratio,
+                image_size=image_size,
                 number_of_images=1,
                 output_mime_type="image/png",
             )
@@ -183,7 +285,8 @@ class ImageGenerationAgent:
 
             try:
                 gimg.save(tmp_path)
-                img = Image.open(tmp_path).convert("RGBA")
+                with Image.open(tmp_path) as src:
+                    img = src.convert("RGBA")
             finally:
                 if os.path.exists(tmp_path):
                     os.remove(tmp_path)
@@ -192,16 +295,24 @@ class ImageGenerationAgent:
             print(f"⚠️ Imagen failed, using plain white background: {e}")
             return Image.new("RGBA", (width, height), (255, 255, 255, 255))
 
-        return img.resize((width, height), Image.LANCZOS)
+        if imagen_config:
+            # scale to cover + center crop, Imagen's closest aspect (e.g. 3:4 for A4) isn't exact
+            resized = ImageOps.fit(img, (width, height), Image.LANCZOS)
+        else:
+            resized = img.resize((width, height), Image.LANCZOS)
+        # the 1K source isn't needed once resized, release it before compositing
+        img.close()
+        return resized
 
     # todo create layouts for different campaigns / regions
     # for now this is a simple layout tool using Pillow keeping brand guidelines consistent
     # this is very much how banner templates are created using any tools necessary, canvas, html etc..
-    def _composite_layers(self, background, product_img, mascot_img, logo_img):
+    def _composite_layers(self, background, product_img, mascot_img, logo_img, in_place=False):
         """
         Composite: logo → product (bottom-right) → mascot (bottom-left, optional)
+        in_place=True pastes straight onto background instead of a copy (memory-bounded mode).
         """
-        canvas = background.copy()
+        canvas = background if in_place else background.copy()
 
         def scale(img, max_w, max_h):
             if img is None:
@@ -212,9 +323,9 @@ class ImageGenerationAgent:
         W, H = canvas.size
 
         # Make product more prominent
-        product_img = scale(product_img, W // 2, H // 2)
-        mascot_img = scale(mascot_img, W // 5, H // 5)
-        logo_img = scale(logo_img, W // 6, H // 6)
+        product_img = scale(product_img, W // self.PRODUCT_BOX_DIVISOR, H // self.PRODUCT_BOX_DIVISOR)
+        mascot_img = scale(mascot_img, W // self.MASCOT_BOX_DIVISOR, H // self.MASCOT_BOX_DIVISOR)
+        logo_img = scale(logo_img, W // self.LOGO_BOX_DIVISOR, H // self.LOGO_BOX_DIVISOR)
 
         # Logo: top-left with margin
         if logo_img:
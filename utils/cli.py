@@ -33,6 +33,22 @@ def parse_args():
         default=None,
         help="Optional Imagen seed for deterministic results.",
     )
+    # memory knobs for big renders so the pods don't get OOM-killed
+    parser.add_argument(
+        "--memory-bounded",
+        action="store_true",
+        help="Composite in place and keep at most one full-size canvas in memory.",
+    )
+    parser.add_argument(
+        "--mem-report",
+        action="store_true",
+        help="Print peak memory (tracemalloc + RSS) per render stage.",
+    )
+    parser.add_argument(
+        "--large-sizes",
+        action="store_true",
+        help="Also render 4K and A4 print sizes (pair with --memory-bounded).",
+    )
 
     return parser.parse_args()
 
@@ -43,7 +59,12 @@ def main():
     # project root = scaled_content_agent/
     project_root = Path(__file__).resolve().parents[1]
     # create an instance of the root_agent
-    orchestrator = Orchestrator(project_root=project_root)
+    orchestrator = Orchestrator(
+        project_root=project_root,
+        memory_bounded=args.memory_bounded,
+        mem_report=args.mem_report,
+        large_sizes=args.large_sizes,
+    )
     # run the initial method from the model, pass in the path of the brief and the output folder, seed is optional
     orchestrator.run_ingestion_and_prepare_outputs(
         brief_path=args.brief,
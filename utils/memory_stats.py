@@ -0,0 +1,119 @@
+# scaled_content_agent/utils/memory_stats.py
+# small helper to see where render memory goes before the pods get OOM-killed
+
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# resource is unix only, on windows we just skip the RSS fallback
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+MB = 1024 * 1024
+
+
+def _read_proc_status_kb(field):
+    # linux only: VmRSS = current RSS, VmHWM = peak RSS ("high water mark")
+    try:
+        with open("/proc/self/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _reset_rss_peak():
+    # writing "5" to clear_refs resets VmHWM so we get a per-stage peak (linux 4.0+)
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="utf-8") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss():
+    peak = _read_proc_status_kb("VmHWM")
+    if peak is not None:
+        return peak
+    if resource is None:
+        return 0
+    # ru_maxrss is KB on linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+class StageMemoryTracker:
+    """
+    Records peak memory per render stage:
+      - py_peak: tracemalloc peak (python-side allocations)
+      - rss_peak: process peak RSS, includes Pillow's C pixel buffers
+        (this is the number the OOM killer cares about)
+    Disabled trackers are a no-op so the agent can always wrap its stages.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.stages = {}
+        self._owns_tracemalloc = False
+        # when VmHWM can't be reset the rss peak is process-lifetime, not per stage
+        self._per_stage_rss = False
+
+    def start(self):
+        if not self.enabled:
+            return
+        # fresh report per run, a reused agent shouldn't add onto the last run's numbers
+        self.stages = {}
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        self._per_stage_rss = _reset_rss_peak()
+
+    def stop(self):
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+
+        tracemalloc.reset_peak()
+        if self._per_stage_rss:
+            _reset_rss_peak()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            _, py_peak = tracemalloc.get_traced_memory()
+            rss_peak = _peak_rss()
+
+            stats = self.stages.setdefault(
+                name, {"calls": 0, "seconds": 0.0, "py_peak": 0, "rss_peak": 0}
+            )
+            stats["calls"] += 1
+            stats["seconds"] += elapsed
+            stats["py_peak"] = max(stats["py_peak"], py_peak)
+            stats["rss_peak"] = max(stats["rss_peak"], rss_peak)
+
+    def print_report(self):
+        if not self.enabled or not self.stages:
+            return
+        print("\n📈 Peak memory per stage")
+        if not self._per_stage_rss:
+            print("   (rss_peak is process-lifetime peak on this platform)")
+        print(f"   {'stage':<16}{'calls':>6}{'py_peak MB':>12}{'rss_peak MB':>13}{'seconds':>10}")
+        for name, s in self.stages.items():
+            print(
+                f"   {name:<16}{s['calls']:>6}"
+                f"{s['py_peak'] / MB:>12.1f}{s['rss_peak'] / MB:>13.1f}{s['seconds']:>10.2f}"
+            )